@@ -11,7 +11,7 @@ Key features (EN):
 - Optional signing: HMAC-SHA256 (stdlib) or Ed25519 (if 'cryptography' installed).
 - Policy enforcement: allow/deny for targets; fail-closed if violated.
 - Robust CLI with deterministic output (for CI/forensics).
-- Single-file; stdlib only (Ed25519 is optional).
+- Single-file; stdlib only (Ed25519 and xxhash are optional).
 
 Usage (quick):
   python patchtrap_mil.py run suspicious.py --watch builtins.open,socket.socket --auto-restore 1
@@ -55,17 +55,19 @@ import base64
 import hashlib
 import hmac
 import importlib
-import inspect
 import io
 import json
+import marshal
 import os
 import runpy
 import sys
 import threading
 import time
 import types
+import weakref
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, Tuple, List, Iterable, Optional
+from typing import Any, Callable, Deque, Dict, Tuple, List, Iterable, Optional
 
 # Optional Ed25519 (recommended but not required)
 _ED25519 = False
@@ -78,12 +80,31 @@ try:
 except Exception:
     _ED25519 = False
 
+# Optional xxhash (faster fingerprint digest)
+_XXHASH = False
+try:
+    import xxhash
+    _XXHASH = True
+except Exception:
+    _XXHASH = False
+
 # ===========
 # Hash utils
 # ===========
 def _sha256_hex(b: bytes) -> str:
     h = hashlib.sha256(); h.update(b); return h.hexdigest()
 
+# Change-detection digest for fingerprints (not part of the signed chain).
+# Fingerprints only need to notice change; --strong-hash switches them to SHA-256.
+if _XXHASH:
+    _FP_ALGO = "xxh3_128"
+    def _fp_hex(b: bytes) -> str:
+        return xxhash.xxh3_128(b).hexdigest()
+else:
+    _FP_ALGO = "blake2b-128"
+    def _fp_hex(b: bytes) -> str:
+        return hashlib.blake2b(b, digest_size=16, usedforsecurity=False).hexdigest()
+
 def _sha256(b: bytes) -> bytes:
     h = hashlib.sha256(); h.update(b); return h.digest()
 
@@ -127,56 +148,116 @@ def chain_next(prev: bytes, leaf: bytes) -> bytes:
 # ==========================
 # Fingerprinting & resolving
 # ==========================
-def _fingerprint_callable(obj: Any) -> Dict[str, Any]:
+# function -> (code object, hasher, hash, where); a hit requires the same __code__ and hasher.
+# Bound methods are rebuilt on every attribute access, so they are not cached.
+_FP_CACHE: "weakref.WeakKeyDictionary[Any, Tuple[types.CodeType, Any, str, str]]" = weakref.WeakKeyDictionary()
+
+def _fp_code(obj: Any, code: types.CodeType, hexer) -> Tuple[str, str]:
+    """(hash, where) over bytecode + consts + names + filename + firstlineno."""
+    try:
+        # version 2: no FLAG_REF back-references, whose placement depends on refcounts
+        payload = marshal.dumps((code.co_code, code.co_consts, code.co_names,
+                                 code.co_varnames, code.co_filename, code.co_firstlineno), 2)
+    except ValueError:  # unmarshallable const
+        payload = b"||".join([
+            code.co_code,
+            repr(code.co_consts).encode(),
+            repr(code.co_names).encode(),
+            repr(code.co_varnames).encode(),
+            repr(code.co_filename).encode(),
+            repr(code.co_firstlineno).encode(),
+        ])
+    return hexer(payload), f"{obj.__module__}.{getattr(obj, '__qualname__', getattr(obj, '__name__', ''))}"
+
+def _fp_function(obj: Any, hexer) -> Tuple[str, str]:
+    code = obj.__code__
+    hit = _FP_CACHE.get(obj)
+    if hit is not None and hit[0] is code and hit[1] is hexer:
+        return hit[2], hit[3]
+    digest, where = _fp_code(obj, code, hexer)
+    _FP_CACHE[obj] = (code, hexer, digest, where)
+    return digest, where
+
+def _fp_method(obj: Any, hexer) -> Tuple[str, str]:
+    return _fp_code(obj, obj.__code__, hexer)
+
+def _fp_builtin(obj: Any, hexer) -> Tuple[str, str]:
+    # bound C methods (lst.append, sys.stdout.write, x.__call__) are rebuilt on every
+    # attribute access, so key them by the object they are bound to, not their own id
+    bound = getattr(obj, "__self__", None)
+    if bound is not None and not isinstance(bound, types.ModuleType):
+        ident = f"{id(bound)}.{obj.__name__}"
+    else:
+        ident = str(id(obj))
+    tag = f"{getattr(obj, '__module__', '')}:{getattr(obj, '__qualname__', getattr(obj, '__name__', ''))}:{ident}"
+    return hexer(tag.encode()), tag
+
+def _fp_generic(obj: Any, hexer) -> Tuple[str, str]:
+    if callable(obj):
+        # name classes (socket.socket -> EvilSocket) without calling a possibly costly __repr__
+        qual = getattr(obj, "__qualname__", None)
+        name = f"{getattr(obj, '__module__', '')}.{qual}:" if isinstance(qual, str) else ""
+        tag = f"{type(obj).__module__}.{type(obj).__qualname__}:{name}{hex(id(obj))}"
+    else:
+        tag = f"not-callable:{repr(obj)[:80]}"
+    return hexer(tag.encode()), tag
+
+# exact-type dispatch; none of these types can be subclassed
+_FP_DISPATCH = {
+    types.FunctionType: _fp_function,
+    types.MethodType: _fp_method,
+    types.BuiltinFunctionType: _fp_builtin,  # same type as BuiltinMethodType
+    types.MethodWrapperType: _fp_builtin,
+}
+
+def _fingerprint_callable(obj: Any, strong: bool = False) -> Dict[str, Any]:
     """
-    Produce a robust fingerprint for Python callables.
-    - For functions/methods: hash bytecode + consts + names + filename + firstlineno.
-    - For builtins/C callables: module/qualname/repr hash.
-    - For other callables: class+repr hash.
+    Produce a robust fingerprint for Python callables (SHA-256 if strong, else _fp_hex).
+    - For functions/methods: hash bytecode + consts + names + filename + firstlineno
+      (functions are cached until their __code__ is swapped).
+    - For builtins/C callables: module/qualname/identity hash.
+    - For other callables: class+identity hash (no __repr__ call; it may be costly).
     """
+    hexer = _sha256_hex if strong else _fp_hex
     fp: Dict[str, Any] = {"type": type(obj).__name__}
     try:
-        if inspect.isfunction(obj) or inspect.ismethod(obj):
-            code = obj.__code__
-            payload = b"||".join([
-                code.co_code,
-                repr(code.co_consts).encode(),
-                repr(code.co_names).encode(),
-                repr(code.co_varnames).encode(),
-                repr(code.co_filename).encode(),
-                repr(code.co_firstlineno).encode(),
-            ])
-            fp["hash"] = _sha256_hex(payload)
-            fp["where"] = f"{obj.__module__}.{getattr(obj, '__qualname__', getattr(obj, '__name__', ''))}"
-        elif isinstance(obj, (types.BuiltinFunctionType, types.BuiltinMethodType)):
-            tag = f"{getattr(obj, '__module__', '')}:{getattr(obj, '__qualname__', getattr(obj, '__name__', ''))}:{repr(obj)[:80]}"
-            fp["hash"] = _sha256_hex(tag.encode())
-            fp["where"] = tag
-        elif callable(obj):
-            tag = f"{obj.__class__.__module__}.{obj.__class__.__qualname__}:{repr(obj)[:80]}"
-            fp["hash"] = _sha256_hex(tag.encode())
-            fp["where"] = tag
-        else:
-            tag = f"not-callable:{repr(obj)[:80]}"
-            fp["hash"] = _sha256_hex(tag.encode())
-            fp["where"] = tag
+        fp["hash"], fp["where"] = _FP_DISPATCH.get(type(obj), _fp_generic)(obj, hexer)
     except Exception as e:
         tag = f"error:{type(obj).__name__}:{repr(e)[:60]}"
-        fp["hash"] = _sha256_hex(tag.encode()); fp["where"] = tag
+        fp["hash"] = hexer(tag.encode()); fp["where"] = tag
     return fp
 
+def _walk_parts(parts: Tuple[str, ...]) -> List[Any]:
+    """Objects along a split dotted name: [module, ..., container of the last part]."""
+    if len(parts) < 2:
+        raise ValueError(f"invalid dotted name: {'.'.join(parts)}")
+    mod = sys.modules.get(parts[0])
+    if mod is None:  # not yet imported
+        mod = importlib.import_module(parts[0])
+    path: List[Any] = [mod]
+    for p in parts[1:-1]:
+        path.append(getattr(path[-1], p))
+    return path
+
+def _path_intact(parts: Tuple[str, ...], path: List[Any]) -> bool:
+    """True if every hop of `path` (from _walk_parts) is still the live object."""
+    if sys.modules.get(parts[0]) is not path[0]:
+        return False
+    for parent, name, child in zip(path, parts[1:-1], path[1:]):
+        if getattr(parent, name, None) is not child:
+            return False
+    return True
+
 def _resolve_dotted(name: str) -> Tuple[Any, Any, str, str]:
     """
     Resolve a dotted name like 'module.sub.obj' and return:
     (container_object, attribute_value, container_qualname, attr_name)
     """
-    parts = name.split(".")
-    if len(parts) < 2:
-        raise ValueError(f"invalid dotted name: {name}")
-    mod = importlib.import_module(parts[0])
-    obj: Any = mod
-    for p in parts[1:-1]:
-        obj = getattr(obj, p)
+    return _resolve_parts(tuple(name.split(".")))
+
+def _resolve_parts(parts: Tuple[str, ...], path: Optional[List[Any]] = None) -> Tuple[Any, Any, str, str]:
+    """_resolve_dotted for a name already split on '.' (reusing `path` if already walked)."""
+    obj = (path or _walk_parts(parts))[-1]
     attr = parts[-1]
     val = getattr(obj, attr)
     container_qual = f"{obj.__module__}.{getattr(obj, '__qualname__', getattr(obj, '__name__', ''))}" if hasattr(obj, "__module__") else repr(obj)
@@ -215,6 +296,22 @@ class SecurityError(RuntimeError):
 # ==========================
 # PatchTrap
 # ==========================
+def _ref(obj: Any) -> Callable[[], Any]:
+    """weakref.ref(obj) where supported, else a closure holding obj strongly."""
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+def _environ_snapshot() -> Dict[str, str]:
+    """dict(os.environ), retried if another thread deletes a key mid-copy
+    (_Environ lists its keys first, then looks each one up)."""
+    while True:
+        try:
+            return dict(os.environ)
+        except KeyError:
+            continue
+
 def _short(x: Any) -> str:
     try:
         s = repr(x);  return s if len(s) <= 240 else s[:240]+"..."
@@ -238,31 +335,47 @@ class PatchTrapMIL:
                  scan_during: bool = False,
                  fail_closed: bool = False,
                  check_modules: bool = False,
-                 policy: Optional[Policy] = None):
+                 policy: Optional[Policy] = None,
+                 strong_hash: bool = False):
         self.targets = targets
+        self._parts: Dict[str, Tuple[str, ...]] = {dotted: tuple(dotted.split(".")) for dotted in targets}
         self.auto_restore = bool(auto_restore)
         self.interval = max(0.0, float(interval))
         self.scan_during = bool(scan_during)
         self.fail_closed = bool(fail_closed)
+        self.strong_hash = bool(strong_hash)
         self.baseline: Dict[str, Dict[str, Any]] = {}
-        self.originals: Dict[str, Any] = {}
-        self.alerts: List[Dict[str, Any]] = []
+        self.originals: Dict[str, Any] = {}  # object, or weakref.ref to it (see seal)
+        # dotted -> (attr, refs to the objects on its path), set by seal(); weak where
+        # possible so the guard doesn't pin modules, classes or other containers
+        self._resolved: Dict[str, Tuple[str, List[Callable[[], Any]]]] = {}
+        self._codes: Dict[str, Callable[[], Any]] = {}  # dotted -> ref to the sealed __code__ of function targets
+        self.alerts: Deque[Dict[str, Any]] = deque()  # list() only when the report is built
         self.meta_path0 = list(sys.meta_path)
-        self.env0 = dict(os.environ)
+        self._meta_path0_names = tuple(type(x).__name__ for x in self.meta_path0)
+        self.env0 = _environ_snapshot()
         self.modules0 = set(sys.modules.keys())
+        # last reported deviation per check (target / "meta_path" / "env" / "modules"):
+        # periodic scans only emit when the observed state changes
+        self._reported: Dict[str, Any] = {}
         self.check_modules = bool(check_modules)
         self.policy = policy or Policy(enforce=False)
         # tamper-evident aggregation
         self._leaves: List[bytes] = []
         self._chain_tip: bytes = _sha256(b'')  # cumulative rolling hash
+        self._lock = threading.Lock()  # _ingest is shared with the background scanner
+        # periodic during-run scanning (see _scan_loop)
+        self._stop = threading.Event()
+        self._loop_error: Optional[SecurityError] = None
 
     # --- tamper-evident ingest
     def _ingest(self, event: Dict[str, Any]):
         """Add an event into Merkle + chain."""
         lf = leaf_hash(event)
-        self._leaves.append(lf)
-        self._chain_tip = chain_next(self._chain_tip, lf)
-        self.alerts.append(event)
+        with self._lock:
+            self._leaves.append(lf)
+            self._chain_tip = chain_next(self._chain_tip, lf)
+            self.alerts.append(event)
 
     # --- sealing
     def seal(self):
@@ -270,74 +383,147 @@ class PatchTrapMIL:
             # policy pre-check for targets (fail-closed if needed)
             if self.fail_closed:
                 self.policy.check(dotted)
-            container, val, container_qual, attr = _resolve_dotted(dotted)
-            self.originals[dotted] = val
+            path = _walk_parts(self._parts[dotted])
+            container, val, container_qual, attr = _resolve_parts(self._parts[dotted], path)
+            # auto-restore needs the original alive after a patch drops it. Otherwise hold
+            # plain functions weakly (their fingerprint is code-based); anything fingerprinted
+            # by id() stays strong so a replacement can't reuse its freed address.
+            if not self.auto_restore and isinstance(val, types.FunctionType):
+                self.originals[dotted] = weakref.ref(val)
+            else:
+                self.originals[dotted] = val
+            self._resolved[dotted] = (attr, [_ref(o) for o in path])
+            if isinstance(val, types.FunctionType):
+                self._codes[dotted] = _ref(val.__code__)
             self.baseline[dotted] = {
-                "fp": _fingerprint_callable(val),
+                "fp": _fingerprint_callable(val, self.strong_hash),
                 "container": container_qual,
                 "attr": attr,
             }
 
+    def _original(self, dotted: str) -> Any:
+        """Sealed original for a target, or None if it was weakly held and collected."""
+        orig = self.originals.get(dotted)
+        return orig() if isinstance(orig, weakref.ref) else orig
+
     # --- scanning
+    def _is_new(self, key: str, state: Any) -> bool:
+        """True (and remember `state`) unless `state` was the last one reported for `key`."""
+        if key in self._reported and self._reported[key] == state:
+            return False
+        self._reported[key] = state
+        return True
+
     def _scan_once(self, phase: str):
         # detect target replacement
         for dotted in self.targets:
+            base = self.baseline.get(dotted)
+            if not base:  # should not happen
+                continue
+            attr, refs = self._resolved[dotted]
+            path = [r() for r in refs]
             try:
-                container, current, container_qual, attr = _resolve_dotted(dotted)
+                if all(o is not None for o in path) and _path_intact(self._parts[dotted], path):
+                    container = path[-1]
+                    current = getattr(container, attr)
+                else:  # an intermediate was swapped or freed: check (and restore into) the live one
+                    container, current, _, attr = _resolve_parts(self._parts[dotted])
             except Exception as e:
-                self._ingest({"kind":"resolve_error","phase":phase,"target": dotted, "error": repr(e)})
+                if self._is_new(dotted, ("resolve_error", repr(e))):
+                    self._ingest({"kind":"resolve_error","phase":phase,"target": dotted, "error": repr(e)})
                 continue
-            base = self.baseline.get(dotted)
-            if not base:  # should not happen
+            # same object (and, for functions, same __code__) -> fingerprint cannot differ
+            if current is self._original(dotted) and (
+                    not isinstance(current, types.FunctionType) or current.__code__ is self._codes[dotted]()):
+                self._reported.pop(dotted, None)
                 continue
-            fp_now = _fingerprint_callable(current)
-            if fp_now["hash"] != base["fp"]["hash"]:
+            fp_now = _fingerprint_callable(current, self.strong_hash)
+            if fp_now["hash"] == base["fp"]["hash"]:
+                self._reported.pop(dotted, None)
+            elif self._is_new(dotted, ("replaced", fp_now["hash"])):
                 ev = {
                     "kind":"replaced","phase":phase,"target": dotted,
                     "before": base["fp"], "after": fp_now
                 }
                 self._ingest(ev)
                 if self.auto_restore:
-                    try:
-                        setattr(container, attr, self.originals[dotted])
-                        self._ingest({"kind":"restore","phase":phase,"target": dotted,"status":"ok"})
-                    except Exception as e:
-                        self._ingest({"kind":"restore","phase":phase,"target": dotted,"status":"fail","error": repr(e)})
+                    orig = self._original(dotted)
+                    if orig is None:
+                        self._ingest({"kind":"restore_stale","phase":phase,"target": dotted})
+                    else:
+                        try:
+                            setattr(container, attr, orig)
+                            self._reported.pop(dotted, None)  # back to baseline; a re-patch is new
+                            self._ingest({"kind":"restore","phase":phase,"target": dotted,"status":"ok"})
+                        except Exception as e:
+                            self._ingest({"kind":"restore","phase":phase,"target": dotted,"status":"fail","error": repr(e)})
                 elif self.fail_closed:
                     raise SecurityError(f"Tamper detected on {dotted}")
 
-        # import hooks (meta_path)
-        mp_before = [type(x).__name__ for x in self.meta_path0]
-        mp_now = [type(x).__name__ for x in list(sys.meta_path)]
-        if mp_now != mp_before:
-            self._ingest({"kind":"meta_path_changed","phase":phase,"before": mp_before,"after": mp_now})
+        # import hooks (meta_path); same finders in the same order -> unchanged
+        mp = list(sys.meta_path)
+        mp_now = None
+        if len(mp) != len(self.meta_path0) or any(a is not b for a, b in zip(mp, self.meta_path0)):
+            mp_now = [type(x).__name__ for x in mp]
+            if mp_now == list(self._meta_path0_names):
+                mp_now = None
+        if mp_now is None:
+            self._reported.pop("meta_path", None)
+        elif self._is_new("meta_path", mp_now):
+            self._ingest({"kind":"meta_path_changed","phase":phase,"before": list(self._meta_path0_names),"after": mp_now})
             if self.fail_closed:
                 raise SecurityError("meta_path changed")
 
-        # environment
-        env_now = dict(os.environ)
-        added = sorted(set(env_now) - set(self.env0))
-        removed = sorted(set(self.env0) - set(env_now))
-        changed = sorted(k for k in set(env_now).intersection(self.env0) if env_now[k] != self.env0[k])
-        if added or removed or changed:
-            self._ingest({
-                "kind":"env_changed","phase":phase,
-                "added": {k: env_now[k] for k in added},
-                "removed": {k: self.env0[k] for k in removed},
-                "changed": {k: {"before": self.env0[k], "after": env_now[k]} for k in changed},
-            })
-            if self.fail_closed:
-                raise SecurityError("environment changed")
+        # environment; exact dict compare first, diff only on mismatch
+        env_now = _environ_snapshot()
+        env0 = self.env0
+        if env_now == env0:
+            self._reported.pop("env", None)
+        elif self._is_new("env", env_now):
+            sym = env_now.keys() ^ env0.keys()
+            added = [k for k in sym if k in env_now]
+            removed = [k for k in sym if k in env0]
+            small, other = (env_now, env0) if len(env_now) <= len(env0) else (env0, env_now)
+            changed = [k for k in small if k in other and env_now[k] != env0[k]]
+            # no sorting: these become dict keys, which canonical_bytes sorts
+            if added or removed or changed:
+                self._ingest({
+                    "kind":"env_changed","phase":phase,
+                    "added": {k: env_now[k] for k in added},
+                    "removed": {k: env0[k] for k in removed},
+                    "changed": {k: {"before": env0[k], "after": env_now[k]} for k in changed},
+                })
+                if self.fail_closed:
+                    raise SecurityError("environment changed")
 
         # modules (optional)
         if self.check_modules:
             mods_now = set(sys.modules.keys())
-            if mods_now != self.modules0:
+            if mods_now == self.modules0:
+                self._reported.pop("modules", None)
+            elif self._is_new("modules", mods_now):
                 newmods = sorted(list(mods_now - self.modules0))[:50]
                 delmods = sorted(list(self.modules0 - mods_now))[:50]
                 self._ingest({"kind":"modules_changed","phase":phase,"added": newmods,"removed": delmods})
                 # don’t fail-closed here; module churn can be normal. Toggle if needed.
 
+    def _scan_loop(self):
+        """
+        Background scanner: one 'during' scan every `interval` until stopped.
+        A fail-closed violation cannot unwind the target from this thread: the first
+        one is kept and raised by run() once the target returns, exits or raises.
+        Until then the target keeps running and scanning (and auto-restore) continues.
+        Any other failure is logged as a scan_error event and the next tick retries.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self._scan_once(phase="during")
+            except SecurityError as e:
+                if self._loop_error is None:
+                    self._loop_error = e
+            except Exception as e:
+                self._ingest({"kind":"scan_error","phase":"during","error": repr(e)})
+
     # --- execution
     def run(self, target_path: str, args_line: str = "") -> int:
         old_argv = sys.argv[:]
@@ -359,16 +545,21 @@ class PatchTrapMIL:
             print(f"[patchtrap] run begin: {os.path.abspath(target_path)}")
             # pre-scan
             self._scan_once(phase="pre")
+            scanner = None
             if self.scan_during and self.interval > 0.0:
-                # run + cooperative periodic scans (same thread)
-                next_tick = time.time() + self.interval
-                runpy.run_path(target_path, run_name="__main__")
-                # single additional during-scan to catch late patches
-                while time.time() < next_tick:
-                    time.sleep(0.01)
-                self._scan_once(phase="during")
-            else:
+                # periodic scans on a daemon thread while the target runs
+                self._stop.clear()
+                scanner = threading.Thread(target=self._scan_loop, name="patchtrap-scan", daemon=True)
+                scanner.start()
+            try:
                 runpy.run_path(target_path, run_name="__main__")
+            finally:
+                if scanner is not None:
+                    self._stop.set()
+                    scanner.join(timeout=max(1.0, self.interval * 2))
+                # a violation seen during the run wins over the target's own exit/exception
+                if self._loop_error is not None:
+                    raise self._loop_error
             # post-scan
             self._scan_once(phase="post")
             print("[patchtrap] run end: status=ok")
@@ -387,8 +578,12 @@ class PatchTrapMIL:
         finally:
             sys.argv = old_argv
             dur = round(time.time() - start, 6)
-            merkle = merkle_root(self._leaves).hex()
-            chain_tip = self._chain_tip.hex()
+            # a scanner that outlived join(timeout) may still be ingesting
+            with self._lock:
+                leaves = list(self._leaves)
+                chain_tip = self._chain_tip.hex()
+                alerts = list(self.alerts)
+            merkle = merkle_root(leaves).hex()
             report = {
                 "summary": {
                     "duration_sec": dur,
@@ -398,11 +593,12 @@ class PatchTrapMIL:
                     "check_modules": self.check_modules,
                     "interval": self.interval,
                     "scan_during": self.scan_during,
-                    "alerts_count": len(self.alerts),
+                    "fingerprint_hash": "sha256" if self.strong_hash else _FP_ALGO,
+                    "alerts_count": len(alerts),
                     "merkle_root": merkle,
                     "chain_tip": chain_tip
                 },
-                "alerts": self.alerts
+                "alerts": alerts
             }
             out = "patchtrap_report.json"
             with open(out, "wb") as f:
@@ -478,9 +674,10 @@ def cli():
     pr.add_argument("--watch", default="builtins.open,socket.socket,subprocess.Popen,random.random",
                     help="Comma-separated dotted names to watch")
     pr.add_argument("--auto-restore", type=int, default=1, help="1 to restore originals on tamper")
-    pr.add_argument("--interval", type=float, default=0.0, help="Scan interval (seconds) for during-scan timing window")
-    pr.add_argument("--scan-during", type=int, default=1, help="1 to scan both before and after (and once during)")
+    pr.add_argument("--interval", type=float, default=0.0, help="Seconds between background scans while the target runs")
+    pr.add_argument("--scan-during", type=int, default=1, help="1 to also scan periodically during the run (needs --interval > 0)")
     pr.add_argument("--fail-closed", type=int, default=0, help="1 to raise SecurityError on tamper/policy violation")
+    pr.add_argument("--strong-hash", type=int, default=0, help="1 to fingerprint with SHA-256 instead of the fast hash")
     pr.add_argument("--check-modules", type=int, default=0, help="1 to report sys.modules churn")
     pr.add_argument("--policy-allow", default="", help="Comma-separated allow patterns (optional)")
     pr.add_argument("--policy-deny", default="", help="Comma-separated deny patterns (optional)")
@@ -521,7 +718,8 @@ def main(argv=None):
             scan_during=bool(a.scan_during),
             fail_closed=bool(a.fail_closed),
             check_modules=bool(a.check_modules),
-            policy=policy
+            policy=policy,
+            strong_hash=bool(a.strong_hash)
         )
         guard.seal()
         rc = guard.run(a.target, args_line=a.args)
@@ -3,6 +3,7 @@ conftest.py — shared fixtures for PatchTrap tests.
 """
 import os
 import sys
+import types
 import pytest
 
 # Insert the project root into sys.path so tests can import patchtrap_mil
@@ -12,3 +13,19 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 def target_script_path():
     """Return the absolute path to target_app.py."""
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "target_app.py"))
+
+@pytest.fixture
+def tmp_module():
+    """Factory: build a throwaway module from `source` and register it in sys.modules."""
+    created = []
+
+    def make(source: str = "", name: str = "patchtrap_tmp_mod") -> types.ModuleType:
+        mod = types.ModuleType(name)
+        exec(source, mod.__dict__)
+        sys.modules[name] = mod
+        created.append(name)
+        return mod
+
+    yield make
+    for name in created:
+        sys.modules.pop(name, None)
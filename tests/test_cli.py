@@ -5,7 +5,7 @@ import os
 import sys
 import pytest
 from unittest.mock import patch
-from patchtrap_mil import main
+from patchtrap_mil import main, canonical_bytes, report_load
 
 def test_cli_run(target_script_path, tmp_path):
     cwd = os.getcwd()
@@ -18,6 +18,9 @@ def test_cli_run(target_script_path, tmp_path):
             assert getattr(e.value, "code", None) == 0
             
         assert os.path.exists("patchtrap_report.json")
+        # the file is exactly canonical JSON, whatever optional packages are installed
+        with open("patchtrap_report.json", "rb") as f:
+            assert f.read() == canonical_bytes(report_load("patchtrap_report.json"))
     finally:
         os.chdir(cwd)
 
@@ -32,19 +32,56 @@ class TestFingerprint:
         fp2 = _fingerprint_callable(func_with_diff_code)
         assert fp1["hash"] != fp2["hash"]
 
+    def test_strong_hash_is_sha256(self):
+        fast = _fingerprint_callable(sample_func)
+        strong = _fingerprint_callable(sample_func, strong=True)
+        assert len(strong["hash"]) == 64
+        assert strong["hash"] != fast["hash"]
+        assert strong["hash"] == _fingerprint_callable(sample_func, strong=True)["hash"]
+        assert strong["hash"] != _fingerprint_callable(func_with_diff_code, strong=True)["hash"]
+
     def test_builtins_fingerprint(self):
         fp = _fingerprint_callable(len)
         assert "builtin_function_or_method" in fp["type"]
         assert "hash" in fp
         assert fp["hash"] == _fingerprint_callable(len)["hash"]
 
+    def test_bound_builtin_keyed_by_self(self):
+        a, b = [], []
+        assert _fingerprint_callable(a.append)["hash"] == _fingerprint_callable(a.append)["hash"]
+        assert _fingerprint_callable(a.append)["hash"] != _fingerprint_callable(b.append)["hash"]
+        assert _fingerprint_callable(a.__len__)["hash"] == _fingerprint_callable(a.__len__)["hash"]
+
     def test_methods_fingerprint(self):
         obj = DummyClass()
         fp = _fingerprint_callable(obj.method)
         assert "hash" in fp
 
+    def test_callable_fingerprint_skips_repr(self):
+        class Loud:
+            def __call__(self): pass
+            def __repr__(self): raise AssertionError("repr called")
+        obj = Loud()
+        fp = _fingerprint_callable(obj)
+        assert not fp["where"].startswith("error:")
+        assert fp["hash"] == _fingerprint_callable(obj)["hash"]
+        assert fp["hash"] != _fingerprint_callable(Loud())["hash"]
+
+    def test_class_fingerprint_names_class(self):
+        fp = _fingerprint_callable(DummyClass)
+        assert f"{__name__}.DummyClass:" in fp["where"]
+
     def test_unsupported_object_does_not_crash(self):
         # Fingerprinting a string (not callable) should fallback gracefully
         fp = _fingerprint_callable("hello")
         assert fp["hash"] is not None
         assert "not-callable" in fp.get("where", "")
+
+    def test_code_swap_invalidates_cache(self):
+        def victim():
+            return 1
+        fp1 = _fingerprint_callable(victim)
+        victim.__code__ = func_with_diff_code.__code__
+        fp2 = _fingerprint_callable(victim)
+        assert fp1["hash"] != fp2["hash"]
+        assert fp2["hash"] == _fingerprint_callable(func_with_diff_code)["hash"]
@@ -36,6 +36,9 @@ class TestCanonicalBytes:
         assert "_repr_" in res
         assert res["_repr_"] == "Obj"
 
+    def test_non_ascii_and_float_bytes(self):
+        assert canonical_bytes({"ts": 1e-05, "a": "caf\u00e9"}) == b'{"a":"caf\\u00e9","ts":1e-05}'
+
 
 class TestMerklePrimitives:
     def test_leaf_hash(self):
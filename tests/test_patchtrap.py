@@ -1,10 +1,16 @@
 """
 test_patchtrap.py — tests for PatchTrapMIL core functionality.
 """
+import gc
+import io
 import os
 import sys
+import weakref
+from collections.abc import Mapping
+from types import SimpleNamespace
 import pytest
-from patchtrap_mil import PatchTrapMIL, SecurityError
+import patchtrap_mil
+from patchtrap_mil import PatchTrapMIL, SecurityError, _environ_snapshot
 
 def dummy_target():
     return "original"
@@ -42,6 +48,39 @@ class TestPatchTrapCore:
         # should be restored
         assert dummy_target() == "original"
 
+    def test_detect_code_swap_in_place(self):
+        pt = PatchTrapMIL([f"{__name__}.dummy_target"], auto_restore=False)
+        pt.seal()
+        sealed_code = dummy_target.__code__
+        dummy_target.__code__ = malicious_target.__code__
+        try:
+            pt._scan_once("test")
+        finally:
+            dummy_target.__code__ = sealed_code
+
+        alerts = [a for a in pt.alerts if a["kind"] == "replaced"]
+        assert len(alerts) == 1
+
+    def test_detect_intermediate_replacement(self, tmp_module):
+        mod = tmp_module(
+            "class Sock:\n    def connect(self):\n        return 'ok'\n"
+            "class EvilSock(Sock):\n    def connect(self):\n        return 'exfil'\n"
+            "lst = []\n"
+        )
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.Sock.connect", "patchtrap_tmp_mod.lst.append"],
+                          auto_restore=True)
+        pt.seal()
+        pt._scan_once("test")
+        assert not [a for a in pt.alerts if a["kind"] == "replaced"]
+
+        mod.Sock = mod.EvilSock
+        mod.lst = []
+        pt._scan_once("test")
+        replaced = {a["target"] for a in pt.alerts if a["kind"] == "replaced"}
+        assert replaced == {"patchtrap_tmp_mod.Sock.connect", "patchtrap_tmp_mod.lst.append"}
+        # restored into the live class, not the stale one
+        assert mod.Sock().connect() == "ok"
+
     def test_fail_closed_on_tamper(self):
         global dummy_target
         pt = PatchTrapMIL([f"{__name__}.dummy_target"], auto_restore=False, fail_closed=True)
@@ -63,6 +102,25 @@ class TestPatchTrapCore:
         assert "PATCHTRAP_DUMMY_VAR" in env_alerts[0]["added"]
         del os.environ["PATCHTRAP_DUMMY_VAR"]
 
+    def test_env_removed_and_changed(self):
+        os.environ["PATCHTRAP_DUMMY_GONE"] = "1"
+        os.environ["PATCHTRAP_DUMMY_EDIT"] = "before"
+        try:
+            pt = PatchTrapMIL([], fail_closed=False)
+            pt.seal()
+            del os.environ["PATCHTRAP_DUMMY_GONE"]
+            os.environ["PATCHTRAP_DUMMY_EDIT"] = "after"
+            pt._scan_once("test")
+
+            env_alerts = [a for a in pt.alerts if a["kind"] == "env_changed"]
+            assert len(env_alerts) == 1
+            assert env_alerts[0]["removed"] == {"PATCHTRAP_DUMMY_GONE": "1"}
+            assert env_alerts[0]["changed"] == {"PATCHTRAP_DUMMY_EDIT": {"before": "before", "after": "after"}}
+            assert env_alerts[0]["added"] == {}
+        finally:
+            os.environ.pop("PATCHTRAP_DUMMY_GONE", None)
+            os.environ.pop("PATCHTRAP_DUMMY_EDIT", None)
+
     def test_meta_path_changes(self):
         pt = PatchTrapMIL([], fail_closed=False)
         pt.seal()
@@ -74,3 +132,254 @@ class TestPatchTrapCore:
         mp_alerts = [a for a in pt.alerts if a["kind"] == "meta_path_changed"]
         assert len(mp_alerts) == 1
         sys.meta_path.pop()
+
+    def test_persistent_changes_reported_once(self, tmp_module):
+        mod = tmp_module("def fn():\n    return 1\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.fn"], auto_restore=False)
+        pt.seal()
+        sealed = mod.fn
+        mod.fn = malicious_target
+        os.environ["PATCHTRAP_DUMMY_VAR"] = "1"
+        try:
+            for _ in range(3):
+                pt._scan_once("test")
+            kinds = [a["kind"] for a in pt.alerts]
+            assert kinds.count("replaced") == 1
+            assert kinds.count("env_changed") == 1
+
+            # a different deviation is new again
+            os.environ["PATCHTRAP_DUMMY_VAR"] = "2"
+            pt._scan_once("test")
+            assert [a["kind"] for a in pt.alerts].count("env_changed") == 2
+
+            # back to baseline, then the same tamper again: reported again
+            mod.fn = sealed
+            pt._scan_once("test")
+            mod.fn = malicious_target
+            pt._scan_once("test")
+            assert [a["kind"] for a in pt.alerts].count("replaced") == 2
+        finally:
+            del os.environ["PATCHTRAP_DUMMY_VAR"]
+
+    def test_repatch_after_restore_reported(self, tmp_module):
+        mod = tmp_module("def fn():\n    return 1\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.fn"], auto_restore=True)
+        pt.seal()
+        for _ in range(2):
+            mod.fn = malicious_target
+            pt._scan_once("test")
+        assert [a["kind"] for a in pt.alerts].count("restore") == 2
+
+    def test_environ_snapshot_retries_concurrent_delete(self, monkeypatch):
+        class RacyEnviron(Mapping):
+            """Lists 'GONE' once, then it is deleted before the lookup."""
+            def __init__(self):
+                self.data = {"KEEP": "1"}
+                self.listed = False
+            def __iter__(self):
+                if not self.listed:
+                    self.listed = True
+                    return iter(list(self.data) + ["GONE"])
+                return iter(list(self.data))
+            def __getitem__(self, key):
+                return self.data[key]
+            def __len__(self):
+                return len(self.data)
+
+        monkeypatch.setattr(patchtrap_mil, "os", SimpleNamespace(environ=RacyEnviron()))
+        assert _environ_snapshot() == {"KEEP": "1"}
+
+    def test_deleted_target_reports_resolve_error(self, tmp_module):
+        mod = tmp_module("def fn():\n    return 1\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.fn"], auto_restore=False)
+        pt.seal()
+        del mod.fn
+        pt._scan_once("test")
+        errs = [a for a in pt.alerts if a["kind"] == "resolve_error"]
+        assert len(errs) == 1
+        assert errs[0]["target"] == "patchtrap_tmp_mod.fn"
+
+    def test_originals_held_weakly_without_auto_restore(self, tmp_module):
+        mod = tmp_module("def fn():\n    return 1\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.fn"], auto_restore=False)
+        pt.seal()
+        assert isinstance(pt.originals["patchtrap_tmp_mod.fn"], weakref.ref)
+
+        mod.fn = malicious_target
+        gc.collect()
+        assert pt._original("patchtrap_tmp_mod.fn") is None
+
+        pt.auto_restore = True
+        pt._scan_once("test")
+        kinds = [a["kind"] for a in pt.alerts]
+        assert "replaced" in kinds
+        assert "restore_stale" in kinds
+        assert mod.fn is malicious_target
+
+    def test_guard_does_not_pin_module_without_auto_restore(self, tmp_module):
+        mod = tmp_module("class Box:\n    def fn(self):\n        return 1\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.Box.fn"], auto_restore=False)
+        pt.seal()
+        refs = [weakref.ref(mod), weakref.ref(mod.Box), weakref.ref(mod.Box.fn)]
+        del sys.modules["patchtrap_tmp_mod"], mod
+        gc.collect()
+        assert all(r() is None for r in refs)
+
+        pt._scan_once("test")
+        assert [a for a in pt.alerts if a["kind"] == "resolve_error"]
+
+    def test_id_fingerprinted_originals_held_strongly(self, tmp_module):
+        mod = tmp_module("class Client:\n    pass\n")
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.Client"], auto_restore=False)
+        pt.seal()
+        assert pt.originals["patchtrap_tmp_mod.Client"] is mod.Client
+
+        del mod.Client
+        gc.collect()
+        class Evil:
+            pass
+        mod.Client = Evil
+        pt._scan_once("test")
+        assert [a for a in pt.alerts if a["kind"] == "replaced"]
+
+    def test_originals_held_strongly_with_auto_restore(self):
+        pt = PatchTrapMIL([f"{__name__}.dummy_target"], auto_restore=True)
+        pt.seal()
+        assert pt.originals[f"{__name__}.dummy_target"] is dummy_target
+
+    def test_constant_reference_does_not_alter_fingerprint(self, tmp_module):
+        mod = tmp_module("class C:\n    def m(self):\n        return ('pt const', 1.5)\nobj = C()\n")
+        # bound method: re-fingerprinted on every scan
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.obj.m"], auto_restore=False)
+        pt.seal()
+        keep = list(mod.C.m.__code__.co_consts)
+        pt._scan_once("test")
+        assert keep
+        assert not [a for a in pt.alerts if a["kind"] == "replaced"]
+
+    def test_bound_builtin_targets_stable(self, tmp_module):
+        mod = tmp_module()
+        mod.lst = []
+        mod.buf = io.StringIO()
+        pt = PatchTrapMIL(["patchtrap_tmp_mod.lst.append", "patchtrap_tmp_mod.buf.write",
+                           "patchtrap_tmp_mod.lst.__len__"], auto_restore=False)
+        pt.seal()
+        pt._scan_once("test")
+        assert not [a for a in pt.alerts if a["kind"] == "replaced"]
+
+class TestPeriodicScan:
+    SCRIPT = (
+        "import os, time\n"
+        "os.environ['PATCHTRAP_DURING_VAR'] = '1'\n"
+        "time.sleep(0.3)\n"
+        "del os.environ['PATCHTRAP_DURING_VAR']\n"
+    )
+
+    def test_background_scan_sees_transient_change(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "transient.py"
+        script.write_text(self.SCRIPT)
+        pt = PatchTrapMIL([], interval=0.02, scan_during=True)
+        pt.seal()
+        assert pt.run(str(script)) == 0
+
+        during = [a for a in pt.alerts if a["kind"] == "env_changed" and a["phase"] == "during"]
+        assert during
+        assert "PATCHTRAP_DURING_VAR" in during[0]["added"]
+        # gone again by the post-scan
+        assert not [a for a in pt.alerts if a["kind"] == "env_changed" and a["phase"] == "post"]
+
+    def test_background_scan_fail_closed(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "transient.py"
+        script.write_text(self.SCRIPT)
+        pt = PatchTrapMIL([], interval=0.02, scan_during=True, fail_closed=True)
+        pt.seal()
+        assert pt.run(str(script)) == 2
+        assert [a for a in pt.alerts if a["kind"] == "security_error"]
+
+    def test_background_fail_closed_survives_sys_exit(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "transient_exit.py"
+        script.write_text(self.SCRIPT + "import sys\nsys.exit(0)\n")
+        pt = PatchTrapMIL([], interval=0.02, scan_during=True, fail_closed=True)
+        pt.seal()
+        assert pt.run(str(script)) == 2
+        assert [a for a in pt.alerts if a["kind"] == "security_error"]
+
+    def test_background_fail_closed_survives_exception(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "transient_raise.py"
+        script.write_text(self.SCRIPT + "raise RuntimeError('boom')\n")
+        pt = PatchTrapMIL([], interval=0.02, scan_during=True, fail_closed=True)
+        pt.seal()
+        assert pt.run(str(script)) == 2
+
+    def test_background_scan_continues_after_violation(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "late_patch.py"
+        script.write_text(self.SCRIPT + (
+            "import random, time\n"
+            "random.random = lambda: 0.5\n"
+            "time.sleep(0.3)\n"
+        ))
+        pt = PatchTrapMIL(["random.random"], interval=0.02, scan_during=True,
+                          fail_closed=True, auto_restore=True)
+        pt.seal()
+        assert pt.run(str(script)) == 2
+        assert [a for a in pt.alerts if a["kind"] == "restore" and a["phase"] == "during"]
+
+    def test_background_scan_survives_env_churn(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "churn.py"
+        script.write_text(
+            "import os, time\n"
+            "end, i = time.time() + 0.5, 0\n"
+            "while time.time() < end:\n"
+            "    os.environ['PT_RACE_%d' % i] = '1'\n"
+            "    del os.environ['PT_RACE_%d' % i]\n"
+            "    i += 1\n"
+        )
+        pt = PatchTrapMIL([], interval=0.0001, scan_during=True)
+        pt.seal()
+        # switch threads often so the scanner is preempted mid-copy of os.environ
+        old_switch = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            assert pt.run(str(script)) == 0
+        finally:
+            sys.setswitchinterval(old_switch)
+        assert not [a for a in pt.alerts if a["kind"] == "scan_error"]
+
+    def test_background_scan_error_is_logged(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "sleepy.py"
+        script.write_text("import time\ntime.sleep(0.2)\n")
+        pt = PatchTrapMIL([], interval=0.02, scan_during=True)
+        pt.seal()
+        real_scan = pt._scan_once
+        calls = []
+
+        def flaky_scan(phase):
+            calls.append(phase)
+            if phase == "during" and len(calls) == 2:
+                raise KeyError("boom")
+            real_scan(phase)
+
+        monkeypatch.setattr(pt, "_scan_once", flaky_scan)
+        assert pt.run(str(script)) == 0
+        assert [a for a in pt.alerts if a["kind"] == "scan_error"]
+        # the scanner kept going after the failure
+        assert calls.count("during") > 2
+
+    def test_persistent_env_change_reported_once(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        script = tmp_path / "persist.py"
+        script.write_text("import os, time\nos.environ['PATCHTRAP_PERSIST_VAR'] = '1'\ntime.sleep(0.3)\n")
+        pt = PatchTrapMIL([], interval=0.01, scan_during=True)
+        pt.seal()
+        try:
+            assert pt.run(str(script)) == 0
+        finally:
+            os.environ.pop("PATCHTRAP_PERSIST_VAR", None)
+        assert [a["kind"] for a in pt.alerts].count("env_changed") == 1